@@ -19,8 +19,9 @@ class ExecutionTimeoutError(WorkflowError):
     """
     Raised when workflow execution exceeds the configured timeout.
 
-    This is a cooperative timeout using threading. It checks at periodic
-    intervals and will not interrupt blocking I/O operations immediately.
+    This is a cooperative timeout: the deadline is checked when the
+    timeout flag is read and when execution finishes, so it will not
+    interrupt blocking I/O operations.
 
     Attributes:
         timeout_seconds: The timeout duration that was exceeded
@@ -238,6 +238,9 @@ class WorkflowPersistence:
         Returns:
             The new retry attempt count, or None if the run was not found
         """
+        # Unlike reset_retry_attempt, this is a read-modify-write that
+        # returns the new count, so the row lock keeps concurrent retries
+        # from reading the same value and losing an increment
         try:
             workflow_run = WorkflowRun.objects.select_for_update().get(
                 run_id=run_id
@@ -260,7 +263,6 @@ class WorkflowPersistence:
         return workflow_run.retry_attempt
 
     @staticmethod
-    @transaction.atomic
     def reset_retry_attempt(run_id: str) -> bool:
         """
         Reset the retry attempt counter to zero for a workflow run.
@@ -273,20 +275,19 @@ class WorkflowPersistence:
         Returns:
             True if successful, False if the run was not found
         """
-        try:
-            workflow_run = WorkflowRun.objects.select_for_update().get(
-                run_id=run_id
-            )
-        except WorkflowRun.DoesNotExist:
+        # A single UPDATE is atomic on its own, so no row lock is needed.
+        # It bypasses save(), so pre_save/post_save signals are not sent.
+        updated = WorkflowRun.objects.filter(run_id=run_id).update(
+            retry_attempt=0,
+            updated_at=timezone.now(),
+        )
+        if not updated:
             logger.warning(
                 "Cannot reset retry: workflow run not found: run_id=%s",
                 run_id,
             )
             return False
 
-        workflow_run.retry_attempt = 0
-        workflow_run.save(update_fields=["retry_attempt", "updated_at"])
-
         logger.debug(
             "Reset retry attempt: run_id=%s",
             run_id,
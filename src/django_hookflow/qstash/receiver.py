@@ -12,6 +12,12 @@ from django_hookflow.exceptions import WorkflowError
 # Default clock skew tolerance in seconds
 DEFAULT_CLOCK_SKEW_SECONDS = 60
 
+# JWT decode arguments shared by every verification attempt
+_JWT_ALGORITHMS = ["HS256"]
+_JWT_OPTIONS: dict[str, Any] = {
+    "require": ["iss", "sub", "exp", "nbf", "body"],
+}
+
 
 class QStashReceiver:
     """
@@ -21,6 +27,8 @@ class QStashReceiver:
     the signing keys from the Upstash console.
     """
 
+    __slots__ = ("_current_key", "_next_key")
+
     def __init__(
         self,
         current_signing_key: str,
@@ -67,17 +75,20 @@ class QStashReceiver:
                 DEFAULT_CLOCK_SKEW_SECONDS,
             )
 
-        keys = [self._current_key, self._next_key]
+        keys = [self._current_key]
+        # Outside of a rotation both keys are the same; decode only once
+        if self._next_key != self._current_key:
+            keys.append(self._next_key)
+        # The body hash does not depend on the key, so compute it once
+        expected_body_hash = hashlib.sha256(body.encode("utf-8")).hexdigest()
 
         for key in keys:
             try:
                 claims = jwt.decode(
                     signature,
                     key,
-                    algorithms=["HS256"],
-                    options={
-                        "require": ["iss", "sub", "exp", "nbf", "body"],
-                    },
+                    algorithms=_JWT_ALGORITHMS,
+                    options=_JWT_OPTIONS,
                     leeway=clock_skew_seconds,
                 )
 
@@ -87,9 +98,6 @@ class QStashReceiver:
                 if claims.get("sub") != url:
                     continue
 
-                expected_body_hash = hashlib.sha256(
-                    body.encode("utf-8")
-                ).hexdigest()
                 if claims.get("body") != expected_body_hash:
                     continue
 
@@ -5,6 +5,7 @@ import signal
 import threading
 import time
 from collections.abc import Generator
+from collections.abc import Iterable
 from contextlib import contextmanager
 
 from django.conf import settings
@@ -44,6 +45,7 @@ class ShutdownManager:
         """Initialize the shutdown manager."""
         self._lock = threading.RLock()
         self._shutting_down = False
+        self._shutdown_started = threading.Event()
         self._shutdown_complete = threading.Event()
         self._in_flight: dict[str, float] = {}  # run_id -> start_time
         self._signal_handlers_installed = False
@@ -56,7 +58,7 @@ class ShutdownManager:
             True,
         )
 
-    def _get_shutdown_timeout(self) -> int:
+    def _get_shutdown_timeout(self) -> float:
         """Get the shutdown timeout in seconds."""
         return getattr(
             settings,
@@ -141,6 +143,58 @@ class ShutdownManager:
                 if self._shutting_down and len(self._in_flight) == 0:
                     self._shutdown_complete.set()
 
+    def track_request_start_many(self, run_ids: Iterable[str]) -> bool:
+        """
+        Track the start of several workflow requests at once.
+
+        Takes the lock once for the whole batch instead of once per
+        request.
+
+        Args:
+            run_ids: The workflow run identifiers
+
+        Returns:
+            True if the requests should proceed, False if shutdown is in
+            progress (in which case none of them are tracked)
+        """
+        if not self._is_enabled():
+            return True
+
+        with self._lock:
+            if self._shutting_down:
+                logger.info("Rejecting request batch during shutdown")
+                return False
+
+            now = time.time()
+            self._in_flight.update(dict.fromkeys(run_ids, now))
+            logger.debug(
+                "Tracking request batch start: in_flight=%d",
+                len(self._in_flight),
+            )
+            return True
+
+    def track_request_end_many(self, run_ids: Iterable[str]) -> None:
+        """
+        Track the end of several workflow requests at once.
+
+        Args:
+            run_ids: The workflow run identifiers
+        """
+        if not self._is_enabled():
+            return
+
+        with self._lock:
+            for run_id in run_ids:
+                self._in_flight.pop(run_id, None)
+            logger.debug(
+                "Tracking request batch end: in_flight=%d",
+                len(self._in_flight),
+            )
+
+            # Signal completion if shutting down and no more in-flight
+            if self._shutting_down and len(self._in_flight) == 0:
+                self._shutdown_complete.set()
+
     @contextmanager
     def track_request(self, run_id: str) -> Generator[bool]:
         """
@@ -176,6 +230,7 @@ class ShutdownManager:
                 return
 
             self._shutting_down = True
+            self._shutdown_started.set()
             in_flight = len(self._in_flight)
 
             if in_flight == 0:
@@ -199,7 +254,7 @@ class ShutdownManager:
             with self._lock:
                 remaining = len(self._in_flight)
             logger.warning(
-                "Graceful shutdown timeout (%ds) exceeded, %d request(s) "
+                "Graceful shutdown timeout (%gs) exceeded, %d request(s) "
                 "still in-flight",
                 timeout,
                 remaining,
@@ -252,6 +307,7 @@ class ShutdownManager:
         """
         with self._lock:
             self._shutting_down = False
+            self._shutdown_started.clear()
             self._shutdown_complete.clear()
             self._in_flight.clear()
             logger.debug("Shutdown manager reset")
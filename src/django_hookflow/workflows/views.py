@@ -2,16 +2,21 @@ from __future__ import annotations
 
 import json
 import logging
+import random
 import threading
 import time
 import traceback
 from collections.abc import Generator
 from contextlib import contextmanager
+from functools import lru_cache
 from typing import Any
+from typing import Callable
 
 from django.conf import settings
+from django.core.signals import setting_changed
 from django.db import transaction
 from django.db.utils import DatabaseError
+from django.dispatch import receiver
 from django.http import HttpRequest
 from django.http import HttpResponse
 from django.http import JsonResponse
@@ -46,9 +51,27 @@ DEFAULT_MAX_PUBLISH_FAILURES = 3
 # Default execution timeout in seconds
 DEFAULT_EXECUTION_TIMEOUT = 30
 
+# Publish retry delays in seconds: 0.1s doubling per attempt, capped at 60s
+_MAX_PUBLISH_BACKOFF = 60.0
+_BACKOFF_TABLE = tuple(
+    min(0.1 * (1 << i), _MAX_PUBLISH_BACKOFF) for i in range(32)
+)
 
+# Maximum relative jitter applied to publish retry delays (+/-25%)
+_BACKOFF_JITTER_RATIO = 0.25
+
+# Random source for backoff jitter
+_rng = random.Random()
+
+
+@lru_cache(maxsize=1)
 def _get_max_publish_failures() -> int:
-    """Get the maximum number of publish retry attempts."""
+    """
+    Get the maximum number of publish retry attempts.
+
+    The value is cached; _clear_settings_cache drops it whenever the
+    setting changes (e.g. under override_settings).
+    """
     return getattr(
         settings,
         "DJANGO_HOOKFLOW_MAX_PUBLISH_FAILURES",
@@ -56,6 +79,18 @@ def _get_max_publish_failures() -> int:
     )
 
 
+def _is_backoff_jitter_enabled() -> bool:
+    """Check if jitter is applied to publish retry delays."""
+    return getattr(settings, "DJANGO_HOOKFLOW_BACKOFF_JITTER", False)
+
+
+@receiver(setting_changed)
+def _clear_settings_cache(*, setting: str, **kwargs: Any) -> None:
+    """Invalidate cached settings when Django reports a change."""
+    if setting == "DJANGO_HOOKFLOW_MAX_PUBLISH_FAILURES":
+        _get_max_publish_failures.cache_clear()
+
+
 def _get_execution_timeout() -> int:
     """Get the execution timeout in seconds."""
     return getattr(
@@ -65,19 +100,35 @@ def _get_execution_timeout() -> int:
     )
 
 
+class _Clock:
+    """Time source for execution timeouts, replaceable in tests."""
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+
+_clock = _Clock()
+
+
 class _TimeoutFlag:
     """Thread-safe flag for cooperative timeout checking."""
 
-    def __init__(self) -> None:
+    def __init__(self, deadline: float | None = None) -> None:
+        """
+        Initialize the flag.
+
+        Args:
+            deadline: _clock.monotonic() value after which the flag reports
+                a timeout, or None for no deadline
+        """
         self._timed_out = False
+        self._deadline = deadline
         self._lock = threading.Lock()
 
-    def set_timed_out(self) -> None:
-        with self._lock:
-            self._timed_out = True
-
     def is_timed_out(self) -> bool:
         with self._lock:
+            if not self._timed_out and self._deadline is not None:
+                self._timed_out = _clock.monotonic() >= self._deadline
             return self._timed_out
 
 
@@ -90,9 +141,10 @@ def _execution_timeout(
     """
     Context manager for cooperative execution timeout.
 
-    This uses a threading-based approach that sets a flag when the timeout
-    expires. The workflow code should periodically check this flag via the
-    returned TimeoutFlag object.
+    The returned flag records a deadline and compares it with the clock
+    whenever it is checked, so no timer thread is started. The workflow
+    code may check the flag via the returned TimeoutFlag object; it is
+    always checked when the context exits.
 
     Note: This is a cooperative timeout - it will not interrupt blocking I/O
     operations. It relies on the workflow checking the flag or completing
@@ -109,11 +161,14 @@ def _execution_timeout(
     Raises:
         ExecutionTimeoutError: If the timeout expires before context exits
     """
-    flag = _TimeoutFlag()
-    timer: threading.Timer | None = None
+    deadline = None
+    if timeout_seconds > 0:
+        deadline = _clock.monotonic() + timeout_seconds
+    flag = _TimeoutFlag(deadline)
 
-    def _on_timeout() -> None:
-        flag.set_timed_out()
+    yield flag
+    # Check if we timed out during execution
+    if flag.is_timed_out():
         logger.warning(
             "Execution timeout triggered: workflow_id=%s, run_id=%s, "
             "timeout=%ds",
@@ -121,25 +176,35 @@ def _execution_timeout(
             run_id,
             timeout_seconds,
         )
+        raise ExecutionTimeoutError(
+            f"Workflow execution exceeded timeout of {timeout_seconds}s",
+            timeout_seconds=timeout_seconds,
+            workflow_id=workflow_id,
+            run_id=run_id,
+        )
 
-    if timeout_seconds > 0:
-        timer = threading.Timer(timeout_seconds, _on_timeout)
-        timer.daemon = True
-        timer.start()
 
-    try:
-        yield flag
-        # Check if we timed out during execution
-        if flag.is_timed_out():
-            raise ExecutionTimeoutError(
-                f"Workflow execution exceeded timeout of {timeout_seconds}s",
-                timeout_seconds=timeout_seconds,
-                workflow_id=workflow_id,
-                run_id=run_id,
-            )
-    finally:
-        if timer is not None:
-            timer.cancel()
+def _publish_backoff(publish_attempt: int) -> float:
+    """
+    Get the delay before retrying a failed publish.
+
+    When DJANGO_HOOKFLOW_BACKOFF_JITTER is enabled, the delay is
+    randomly scaled by up to +/-25% so that workers retrying after a
+    shared outage do not publish in lockstep. The 60s cap still holds
+    after jitter is applied.
+
+    Args:
+        publish_attempt: Zero-based index of the attempt that failed
+
+    Returns:
+        Seconds to wait: 0.1s, 0.2s, 0.4s, ... up to 60s
+    """
+    delay = _BACKOFF_TABLE[min(publish_attempt, len(_BACKOFF_TABLE) - 1)]
+    if _is_backoff_jitter_enabled():
+        delay *= 1 + _rng.uniform(
+            -_BACKOFF_JITTER_RATIO, _BACKOFF_JITTER_RATIO
+        )
+    return min(delay, _MAX_PUBLISH_BACKOFF)
 
 
 def _publish_with_retry(
@@ -149,6 +214,7 @@ def _publish_with_retry(
     completed_steps: dict,
     delay_seconds: int | None = None,
     attempt: int = 0,
+    backoff_fn: Callable[[int], float] = _publish_backoff,
 ) -> bool:
     """
     Publish next step with retry logic.
@@ -163,6 +229,8 @@ def _publish_with_retry(
         completed_steps: Completed step results
         delay_seconds: Optional delay before delivery
         attempt: Current retry attempt (for workflow retries)
+        backoff_fn: Maps a failed publish attempt index to the delay in
+            seconds before the next attempt
 
     Returns:
         True if publish succeeded, False if all attempts failed
@@ -192,8 +260,7 @@ def _publish_with_retry(
         except Exception as e:
             last_error = e
             if publish_attempt < max_attempts - 1:
-                # Exponential backoff: 0.1s, 0.2s, 0.4s
-                backoff = 0.1 * (2**publish_attempt)
+                backoff = backoff_fn(publish_attempt)
                 logger.warning(
                     "Publish attempt %d/%d failed, retrying in %.1fs: "
                     "workflow_id=%s, run_id=%s, error=%s",
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import base64
 import hashlib
+import hmac
+import json
 import time
 import unittest
 from unittest.mock import patch
 
-import jwt
 from django.test import RequestFactory
 from django.test import override_settings
 
@@ -14,35 +16,82 @@ from django_hookflow.qstash.receiver import DEFAULT_CLOCK_SKEW_SECONDS
 from django_hookflow.qstash.receiver import QStashReceiver
 from django_hookflow.qstash.receiver import verify_qstash_signature
 
+# Base64url encoding of {"alg":"HS256","typ":"JWT"}
+_JWT_HEADER = b"eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9"
+_PAYLOAD_JSON = b'{"test": "data"}'
+# Rotation keys, long enough to avoid PyJWT's short-HMAC-key warning
+_CURRENT_KEY = "current-signing-key-for-rotation-tests"
+_NEXT_KEY = "next-signing-key-for-rotation-tests"
+_SAME_KEY = "shared-signing-key-for-rotation-tests"
+_OTHER_KEY = "unrelated-signing-key-for-rotation-tests"
+
+
+def _b64url(data: bytes) -> bytes:
+    """Base64url-encode without padding, as JWT requires."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _sign_jwt(payload: dict, signing_key: str) -> str:
+    """Sign a claims dict as an HS256 JWT with the given key."""
+    claims = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    signing_input = _JWT_HEADER + b"." + _b64url(claims)
+    signature = hmac.new(
+        signing_key.encode("utf-8"),
+        signing_input,
+        hashlib.sha256,
+    ).digest()
+    return (signing_input + b"." + _b64url(signature)).decode("ascii")
+
 
 class TestClockSkewTolerance(unittest.TestCase):
     """Tests for clock skew tolerance in QStash signature verification."""
 
-    def setUp(self):
-        self.signing_key = "test-signing-key"
-        self.receiver = QStashReceiver(
-            current_signing_key=self.signing_key,
-            next_signing_key=self.signing_key,
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.signing_key = "test-signing-key"
+        cls.body = _PAYLOAD_JSON.decode("utf-8")
+        cls.url = "https://example.com/webhook/"
+        cls.body_hash = hashlib.sha256(cls.body.encode("utf-8")).hexdigest()
+        cls._base_now = int(time.time())
+        cls.receiver = QStashReceiver(
+            current_signing_key=cls.signing_key,
+            next_signing_key=cls.signing_key,
         )
-        self.body = '{"test": "data"}'
-        self.url = "https://example.com/webhook/"
-        self.body_hash = hashlib.sha256(self.body.encode("utf-8")).hexdigest()
+        # (exp_offset, nbf_offset) pairs used by the tests below
+        offsets = [
+            (300, 0),
+            (-10, 0),
+            (-30, 0),
+            (-120, 0),
+            (300, 30),
+            (-50, 0),
+            (-90, 0),
+        ]
+        cls._tokens: dict[tuple[int, int], str] = {
+            offset: cls._encode_token(*offset) for offset in offsets
+        }
 
-    def _create_token(
-        self,
-        exp_offset: int = 300,
-        nbf_offset: int = 0,
-    ) -> str:
-        """Create a JWT token with specified exp/nbf offsets from now."""
-        now = int(time.time())
+    @classmethod
+    def _encode_token(cls, exp_offset: int, nbf_offset: int) -> str:
+        """Sign a JWT token with exp/nbf offsets from the class clock."""
+        now = cls._base_now
         payload = {
             "iss": "Upstash",
-            "sub": self.url,
+            "sub": cls.url,
             "exp": now + exp_offset,
             "nbf": now + nbf_offset,
-            "body": self.body_hash,
+            "body": cls.body_hash,
         }
-        return jwt.encode(payload, self.signing_key, algorithm="HS256")
+        return _sign_jwt(payload, cls.signing_key)
+
+    def _create_token(
+        self,
+        exp_offset: int = 300,
+        nbf_offset: int = 0,
+    ) -> str:
+        """Return the pre-signed token for the given exp/nbf offsets."""
+        return self._tokens[(exp_offset, nbf_offset)]
 
     def test_verify_accepts_valid_token(self):
         """Test that a valid token is accepted."""
@@ -131,12 +180,50 @@ class TestClockSkewTolerance(unittest.TestCase):
         self.assertEqual(claims["iss"], "Upstash")
 
 
+class TestQStashReceiverKeyRotation(unittest.TestCase):
+    """Tests for verifying tokens against current and next signing keys."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.body = _PAYLOAD_JSON.decode("utf-8")
+        cls.url = "https://example.com/webhook/"
+        now = int(time.time())
+        cls.claims = {
+            "iss": "Upstash",
+            "sub": cls.url,
+            "exp": now + 300,
+            "nbf": now,
+            "body": hashlib.sha256(_PAYLOAD_JSON).hexdigest(),
+        }
+
+    def test_accepts_token_signed_with_next_key(self):
+        """Test that a token signed with the next key is accepted."""
+        receiver = QStashReceiver(
+            current_signing_key=_CURRENT_KEY,
+            next_signing_key=_NEXT_KEY,
+        )
+        token = _sign_jwt(self.claims, _NEXT_KEY)
+
+        claims = receiver.verify(signature=token, body=self.body, url=self.url)
+
+        self.assertEqual(claims["iss"], "Upstash")
+
+    def test_rejects_other_key_when_keys_match(self):
+        """Test that identical keys still reject a token from another key."""
+        receiver = QStashReceiver(
+            current_signing_key=_SAME_KEY,
+            next_signing_key=_SAME_KEY,
+        )
+        token = _sign_jwt(self.claims, _OTHER_KEY)
+
+        with self.assertRaises(WorkflowError):
+            receiver.verify(signature=token, body=self.body, url=self.url)
+
+
 class TestVerifyQStashSignatureClockSkew(unittest.TestCase):
     """Tests for verify_qstash_signature function clock skew handling."""
 
-    def setUp(self):
-        self.factory = RequestFactory()
-
     @patch("django_hookflow.qstash.receiver.settings")
     @patch("django_hookflow.qstash.receiver.QStashReceiver")
     def test_clock_skew_parameter_passed_to_receiver(
@@ -150,9 +237,9 @@ class TestVerifyQStashSignatureClockSkew(unittest.TestCase):
         mock_settings.QSTASH_CURRENT_SIGNING_KEY = "key1"
         mock_settings.QSTASH_NEXT_SIGNING_KEY = "key2"
 
-        request = self.factory.post(
+        request = RequestFactory().post(
             "/webhook/",
-            data='{"test": "data"}',
+            data=_PAYLOAD_JSON,
             content_type="application/json",
             HTTP_UPSTASH_SIGNATURE="test-signature",
         )
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import unittest
-from unittest.mock import MagicMock
 from unittest.mock import patch
 
 import requests
@@ -11,6 +10,16 @@ from django_hookflow.exceptions import WorkflowError
 from django_hookflow.workflows.context import StepManager
 
 
+def _make_response(
+    status_code: int, content: bytes = b""
+) -> requests.Response:
+    """Build a real requests.Response with the given status and body."""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    return response
+
+
 class TestStepManagerCall(unittest.TestCase):
     def setUp(self):
         self.manager = StepManager(
@@ -34,11 +43,7 @@ class TestStepManagerCall(unittest.TestCase):
     @patch("requests.request")
     def test_call_makes_get_request_with_correct_params(self, mock_request):
         """Test that call() makes GET request with correct params."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.content = b'{"success": true}'
-        mock_response.json.return_value = {"success": True}
-        mock_request.return_value = mock_response
+        mock_request.return_value = _make_response(200, b'{"success": true}')
 
         with self.assertRaises(StepCompleted) as context:
             self.manager.call("get-step", "https://api.example.com/data")
@@ -58,11 +63,7 @@ class TestStepManagerCall(unittest.TestCase):
     @patch("requests.request")
     def test_call_makes_post_request_with_body(self, mock_request):
         """Test that call() makes POST request with body."""
-        mock_response = MagicMock()
-        mock_response.status_code = 201
-        mock_response.content = b'{"id": 123}'
-        mock_response.json.return_value = {"id": 123}
-        mock_request.return_value = mock_response
+        mock_request.return_value = _make_response(201, b'{"id": 123}')
 
         body = {"name": "test", "value": 42}
 
@@ -88,11 +89,9 @@ class TestStepManagerCall(unittest.TestCase):
     @patch("requests.request")
     def test_call_passes_custom_headers(self, mock_request):
         """Test that call() passes custom headers."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.content = b'{"authenticated": true}'
-        mock_response.json.return_value = {"authenticated": True}
-        mock_request.return_value = mock_response
+        mock_request.return_value = _make_response(
+            200, b'{"authenticated": true}'
+        )
 
         custom_headers = {
             "Authorization": "Bearer token123",
@@ -118,11 +117,7 @@ class TestStepManagerCall(unittest.TestCase):
     @patch("requests.request")
     def test_call_allows_verify_override_when_enabled(self, mock_request):
         """Test that verify override applies when setting is enabled."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.content = b'{"ok": true}'
-        mock_response.json.return_value = {"ok": True}
-        mock_request.return_value = mock_response
+        mock_request.return_value = _make_response(200, b'{"ok": true}')
 
         with patch(
             "django.conf.settings.DJANGO_HOOKFLOW_VERIFY_SSL",
@@ -148,11 +143,7 @@ class TestStepManagerCall(unittest.TestCase):
     @patch("requests.request")
     def test_call_forces_verify_when_disabled_globally(self, mock_request):
         """Test that verify remains True when setting is disabled."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.content = b'{"ok": true}'
-        mock_response.json.return_value = {"ok": True}
-        mock_request.return_value = mock_response
+        mock_request.return_value = _make_response(200, b'{"ok": true}')
 
         with patch(
             "django.conf.settings.DJANGO_HOOKFLOW_VERIFY_SSL",
@@ -178,10 +169,7 @@ class TestStepManagerCall(unittest.TestCase):
     @patch("requests.request")
     def test_call_handles_empty_response_204(self, mock_request):
         """Test that call() handles empty response (204 No Content)."""
-        mock_response = MagicMock()
-        mock_response.status_code = 204
-        mock_response.content = b""
-        mock_request.return_value = mock_response
+        mock_request.return_value = _make_response(204)
 
         with self.assertRaises(StepCompleted) as context:
             self.manager.call(
@@ -205,8 +193,9 @@ class TestStepManagerCall(unittest.TestCase):
         with self.assertRaises(WorkflowError) as context:
             self.manager.call("conn-step", "https://api.example.com/data")
 
-        self.assertIn("conn-step", str(context.exception))
-        self.assertIn("failed", str(context.exception))
+        msg = str(context.exception)
+        self.assertIn("conn-step", msg)
+        self.assertIn("failed", msg)
 
     @patch("requests.request")
     def test_call_raises_workflow_error_on_timeout(self, mock_request):
@@ -218,35 +207,28 @@ class TestStepManagerCall(unittest.TestCase):
         with self.assertRaises(WorkflowError) as context:
             self.manager.call("timeout-step", "https://api.example.com/slow")
 
-        self.assertIn("timeout-step", str(context.exception))
-        self.assertIn("failed", str(context.exception))
+        msg = str(context.exception)
+        self.assertIn("timeout-step", msg)
+        self.assertIn("failed", msg)
 
     @patch("requests.request")
     def test_call_raises_workflow_error_on_http_error(self, mock_request):
         """Test that call() raises WorkflowError on HTTPError."""
-        mock_response = MagicMock()
-        mock_response.status_code = 500
-        mock_response.raise_for_status.side_effect = (
-            requests.exceptions.HTTPError("500 Server Error")
-        )
-        mock_request.return_value = mock_response
+        mock_request.return_value = _make_response(500)
 
         with self.assertRaises(WorkflowError) as context:
             self.manager.call(
                 "http-error-step", "https://api.example.com/error"
             )
 
-        self.assertIn("http-error-step", str(context.exception))
-        self.assertIn("failed", str(context.exception))
+        msg = str(context.exception)
+        self.assertIn("http-error-step", msg)
+        self.assertIn("failed", msg)
 
     @patch("requests.request")
     def test_call_stores_result_in_completed_steps(self, mock_request):
         """Test that call() stores result in completed_steps dict."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.content = b'{"stored": true}'
-        mock_response.json.return_value = {"stored": True}
-        mock_request.return_value = mock_response
+        mock_request.return_value = _make_response(200, b'{"stored": true}')
 
         with self.assertRaises(StepCompleted) as context:
             self.manager.call("store-step", "https://api.example.com/data")
@@ -259,11 +241,7 @@ class TestStepManagerCall(unittest.TestCase):
     @patch("requests.request")
     def test_call_put_method_works(self, mock_request):
         """Test that PUT method works."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.content = b'{"updated": true}'
-        mock_response.json.return_value = {"updated": True}
-        mock_request.return_value = mock_response
+        mock_request.return_value = _make_response(200, b'{"updated": true}')
 
         body = {"name": "updated_name"}
 
@@ -288,11 +266,7 @@ class TestStepManagerCall(unittest.TestCase):
     @patch("requests.request")
     def test_call_patch_method_works(self, mock_request):
         """Test that PATCH method works."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.content = b'{"patched": true}'
-        mock_response.json.return_value = {"patched": True}
-        mock_request.return_value = mock_response
+        mock_request.return_value = _make_response(200, b'{"patched": true}')
 
         body = {"field": "patched_value"}
 
@@ -317,10 +291,7 @@ class TestStepManagerCall(unittest.TestCase):
     @patch("requests.request")
     def test_call_delete_method_works(self, mock_request):
         """Test that DELETE method works."""
-        mock_response = MagicMock()
-        mock_response.status_code = 204
-        mock_response.content = b""
-        mock_request.return_value = mock_response
+        mock_request.return_value = _make_response(204)
 
         with self.assertRaises(StepCompleted) as context:
             self.manager.call(
@@ -164,8 +164,9 @@ class TestDeadLetterEntryReplay(TestCase):
         with self.assertRaises(WorkflowError) as context:
             entry.replay()
 
-        self.assertIn("unknown-workflow", str(context.exception))
-        self.assertIn("not found", str(context.exception))
+        msg = str(context.exception)
+        self.assertIn("unknown-workflow", msg)
+        self.assertIn("not found", msg)
 
     @patch("django_hookflow.workflows.registry.get_workflow")
     def test_replay_generates_unique_run_id(self, mock_get_workflow):
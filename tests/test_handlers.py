@@ -1,41 +1,54 @@
 from __future__ import annotations
 
 import unittest
-from unittest.mock import MagicMock
 from unittest.mock import patch
 
-from django.test import RequestFactory
+from django.conf import settings
+from django.test import SimpleTestCase
 from django.test import override_settings
 
 from django_hookflow.exceptions import WorkflowError
 from django_hookflow.workflows.handlers import publish_next_step
 from django_hookflow.workflows.handlers import verify_qstash_signature
+from tests.utils import copy_request
+from tests.utils import make_json_request
 
 _BASE64_TOKEN = "c2lnbmVkLWtleS0x"
+_EXPECTED_WEBHOOK_URL = "https://example.com/hookflow/workflow/test-workflow/"
+_PAYLOAD_JSON = b'{"test": "data"}'
+_BASE_SETTINGS = {
+    "DJANGO_HOOKFLOW_DOMAIN": "https://example.com",
+    "DJANGO_HOOKFLOW_WEBHOOK_PATH": "/hookflow/",
+}
+
+
+@override_settings(
+    QSTASH_CURRENT_SIGNING_KEY=_BASE64_TOKEN,
+    QSTASH_NEXT_SIGNING_KEY=_BASE64_TOKEN,
+)
+class TestVerifyQstashSignature(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._base_request = make_json_request(
+            "/hookflow/workflow/test/", _PAYLOAD_JSON
+        )
 
+    def _signed_request(self, signature: str):
+        """Return a copy of the base request with the given signature."""
+        return copy_request(
+            self._base_request, HTTP_UPSTASH_SIGNATURE=signature
+        )
 
-class TestVerifyQstashSignature(unittest.TestCase):
-    def setUp(self):
-        self.factory = RequestFactory()
-
-    @patch("django_hookflow.qstash.receiver.settings")
     @patch("django_hookflow.qstash.receiver.QStashReceiver")
     def test_successful_verification_with_valid_signature(
-        self, mock_receiver_class, mock_settings
+        self, mock_receiver_class
     ):
         """Test successful signature verification with valid signature."""
-        mock_receiver = MagicMock()
+        mock_receiver = mock_receiver_class.return_value
         mock_receiver.verify.return_value = {"iss": "Upstash"}
-        mock_receiver_class.return_value = mock_receiver
-        mock_settings.QSTASH_CURRENT_SIGNING_KEY = _BASE64_TOKEN
-        mock_settings.QSTASH_NEXT_SIGNING_KEY = _BASE64_TOKEN
-
-        request = self.factory.post(
-            "/hookflow/workflow/test/",
-            data='{"test": "data"}',
-            content_type="application/json",
-            HTTP_UPSTASH_SIGNATURE="valid-signature",
-        )
+
+        request = self._signed_request("valid-signature")
 
         result = verify_qstash_signature(request)
 
@@ -43,24 +56,15 @@ class TestVerifyQstashSignature(unittest.TestCase):
         mock_receiver_class.assert_called_once()
         mock_receiver.verify.assert_called_once()
 
-    @patch("django_hookflow.qstash.receiver.settings")
     @patch("django_hookflow.qstash.receiver.QStashReceiver")
     def test_failed_verification_raises_workflow_error(
-        self, mock_receiver_class, mock_settings
+        self, mock_receiver_class
     ):
         """Test that failed verification raises WorkflowError."""
-        mock_receiver = MagicMock()
+        mock_receiver = mock_receiver_class.return_value
         mock_receiver.verify.side_effect = WorkflowError("Invalid signature")
-        mock_receiver_class.return_value = mock_receiver
-        mock_settings.QSTASH_CURRENT_SIGNING_KEY = _BASE64_TOKEN
-        mock_settings.QSTASH_NEXT_SIGNING_KEY = _BASE64_TOKEN
-
-        request = self.factory.post(
-            "/hookflow/workflow/test/",
-            data='{"test": "data"}',
-            content_type="application/json",
-            HTTP_UPSTASH_SIGNATURE="invalid-signature",
-        )
+
+        request = self._signed_request("invalid-signature")
 
         with self.assertRaises(WorkflowError) as context:
             verify_qstash_signature(request)
@@ -68,7 +72,19 @@ class TestVerifyQstashSignature(unittest.TestCase):
         self.assertIn("Invalid signature", str(context.exception))
 
 
-class TestPublishNextStep(unittest.TestCase):
+@override_settings(**_BASE_SETTINGS)
+class TestPublishNextStep(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        patcher = patch("django_hookflow.workflows.handlers.get_qstash_client")
+        cls.mock_get_client = patcher.start()
+        cls.addClassCleanup(patcher.stop)
+
+    def setUp(self):
+        self.mock_get_client.reset_mock(return_value=True)
+        self.mock_client = self.mock_get_client.return_value
+
     def test_raises_error_when_domain_not_set(self):
         """Test error when neither domain setting is set."""
         with override_settings(DJANGO_HOOKFLOW_DOMAIN=None):
@@ -82,93 +98,64 @@ class TestPublishNextStep(unittest.TestCase):
 
             self.assertIn("DJANGO_HOOKFLOW_DOMAIN", str(context.exception))
 
-    @patch("django_hookflow.workflows.handlers.get_qstash_client")
-    def test_publishes_message_without_delay(self, mock_get_client):
-        """Test that message is published without delay."""
-        mock_client = MagicMock()
-        mock_get_client.return_value = mock_client
+    def test_delay_paths(self):
+        """Test delay selection from delay_seconds and sleep steps."""
+        cases = [
+            # (completed_steps, delay_seconds, expected_delay)
+            ({}, 0, None),
+            ({}, 30, "30s"),
+            ({"step-1": "string_result"}, 15, "15s"),
+            ({"step-1": {"result": "value", "other_key": 123}}, 20, "20s"),
+            (
+                {"step-1": "first_result", "sleep-step": {"slept_for": 60}},
+                0,
+                "60s",
+            ),
+            # Sleep delay overrides explicit delay_seconds
+            ({"sleep-step": {"slept_for": 120}}, 30, "120s"),
+        ]
+
+        for completed_steps, delay_seconds, expected in cases:
+            with self.subTest(
+                completed_steps=completed_steps, delay_seconds=delay_seconds
+            ):
+                self.mock_client.reset_mock()
+                publish_next_step(
+                    workflow_id="test-workflow",
+                    run_id="test-run",
+                    data={},
+                    completed_steps=completed_steps,
+                    delay_seconds=delay_seconds,
+                )
+
+                call_kwargs = self.mock_client.publish_json.call_args.kwargs
+                if expected is None:
+                    self.assertNotIn("delay", call_kwargs)
+                else:
+                    self.assertEqual(call_kwargs["delay"], expected)
 
-        with override_settings(
-            DJANGO_HOOKFLOW_DOMAIN="https://example.com",
-            DJANGO_HOOKFLOW_WEBHOOK_PATH="/hookflow/",
-        ):
+    def test_handles_trailing_slash_in_domain(self):
+        """Test that trailing slash in domain is handled correctly."""
+        with override_settings(DJANGO_HOOKFLOW_DOMAIN="https://example.com/"):
             publish_next_step(
                 workflow_id="test-workflow",
                 run_id="test-run",
-                data={"key": "value"},
+                data={},
                 completed_steps={},
             )
 
-        call_kwargs = mock_client.publish_json.call_args.kwargs
+        call_kwargs = self.mock_client.publish_json.call_args.kwargs
+        # Should not have double slashes
         self.assertEqual(
             call_kwargs["url"],
-            "https://example.com/hookflow/workflow/test-workflow/",
+            _EXPECTED_WEBHOOK_URL,
         )
-        self.assertEqual(call_kwargs["body"]["workflow_id"], "test-workflow")
-        self.assertEqual(call_kwargs["body"]["run_id"], "test-run")
-        self.assertEqual(call_kwargs["body"]["data"], {"key": "value"})
-        self.assertEqual(call_kwargs["body"]["completed_steps"], {})
-        # No delay should be passed
-        self.assertNotIn("delay", call_kwargs)
-
-    @patch("django_hookflow.workflows.handlers.get_qstash_client")
-    def test_publishes_message_with_explicit_delay_seconds(
-        self, mock_get_client
-    ):
-        """Test that message is published with explicit delay_seconds."""
-        mock_client = MagicMock()
-        mock_get_client.return_value = mock_client
-
-        with override_settings(
-            DJANGO_HOOKFLOW_DOMAIN="https://example.com",
-            DJANGO_HOOKFLOW_WEBHOOK_PATH="/hookflow/",
-        ):
-            publish_next_step(
-                workflow_id="test-workflow",
-                run_id="test-run",
-                data={"key": "value"},
-                completed_steps={},
-                delay_seconds=30,
-            )
-
-        call_kwargs = mock_client.publish_json.call_args.kwargs
-        self.assertEqual(call_kwargs["delay"], "30s")
-
-    @patch("django_hookflow.workflows.handlers.get_qstash_client")
-    def test_publishes_message_with_sleep_step_delay(self, mock_get_client):
-        """Test that sleep step delay is detected from completed_steps."""
-        mock_client = MagicMock()
-        mock_get_client.return_value = mock_client
 
-        completed_steps = {
-            "step-1": "first_result",
-            "sleep-step": {"slept_for": 60},
-        }
-
-        with override_settings(
-            DJANGO_HOOKFLOW_DOMAIN="https://example.com",
-            DJANGO_HOOKFLOW_WEBHOOK_PATH="/hookflow/",
-        ):
-            publish_next_step(
-                workflow_id="test-workflow",
-                run_id="test-run",
-                data={},
-                completed_steps=completed_steps,
-            )
-
-        call_kwargs = mock_client.publish_json.call_args.kwargs
-        self.assertEqual(call_kwargs["delay"], "60s")
-
-    @patch("django_hookflow.workflows.handlers.get_qstash_client")
-    def test_handles_trailing_slash_in_domain(self, mock_get_client):
-        """Test that trailing slash in domain is handled correctly."""
-        mock_client = MagicMock()
-        mock_get_client.return_value = mock_client
+    def test_raises_workflow_error_on_publish_failure(self):
+        """Test that WorkflowError is raised when QStash publish fails."""
+        self.mock_client.publish_json.side_effect = Exception("Network error")
 
-        with override_settings(
-            DJANGO_HOOKFLOW_DOMAIN="https://example.com/",
-            DJANGO_HOOKFLOW_WEBHOOK_PATH="/hookflow/",
-        ):
+        with self.assertRaises(WorkflowError) as context:
             publish_next_step(
                 workflow_id="test-workflow",
                 run_id="test-run",
@@ -176,58 +163,23 @@ class TestPublishNextStep(unittest.TestCase):
                 completed_steps={},
             )
 
-        call_kwargs = mock_client.publish_json.call_args.kwargs
-        # Should not have double slashes
-        self.assertEqual(
-            call_kwargs["url"],
-            "https://example.com/hookflow/workflow/test-workflow/",
-        )
+        msg = str(context.exception)
+        self.assertIn("Failed to publish next step", msg)
+        self.assertIn("Network error", msg)
 
-    @patch("django_hookflow.workflows.handlers.get_qstash_client")
-    def test_raises_workflow_error_on_publish_failure(self, mock_get_client):
-        """Test that WorkflowError is raised when QStash publish fails."""
-        mock_client = MagicMock()
-        mock_client.publish_json.side_effect = Exception("Network error")
-        mock_get_client.return_value = mock_client
-
-        with override_settings(
-            DJANGO_HOOKFLOW_DOMAIN="https://example.com",
-            DJANGO_HOOKFLOW_WEBHOOK_PATH="/hookflow/",
-        ):
-            with self.assertRaises(WorkflowError) as context:
-                publish_next_step(
-                    workflow_id="test-workflow",
-                    run_id="test-run",
-                    data={},
-                    completed_steps={},
-                )
-
-            self.assertIn(
-                "Failed to publish next step", str(context.exception)
-            )
-            self.assertIn("Network error", str(context.exception))
-
-    @patch("django_hookflow.workflows.handlers.get_qstash_client")
-    def test_payload_structure_is_correct(self, mock_get_client):
+    def test_payload_structure_is_correct(self):
         """Test that payload structure includes all required fields."""
-        mock_client = MagicMock()
-        mock_get_client.return_value = mock_client
-
         data = {"user_id": 123, "action": "process"}
         completed_steps = {"step-1": "result-1", "step-2": {"nested": "data"}}
 
-        with override_settings(
-            DJANGO_HOOKFLOW_DOMAIN="https://example.com",
-            DJANGO_HOOKFLOW_WEBHOOK_PATH="/hookflow/",
-        ):
-            publish_next_step(
-                workflow_id="my-workflow",
-                run_id="my-run-id",
-                data=data,
-                completed_steps=completed_steps,
-            )
+        publish_next_step(
+            workflow_id="my-workflow",
+            run_id="my-run-id",
+            data=data,
+            completed_steps=completed_steps,
+        )
 
-        call_kwargs = mock_client.publish_json.call_args.kwargs
+        call_kwargs = self.mock_client.publish_json.call_args.kwargs
         payload = call_kwargs["body"]
 
         self.assertEqual(payload["workflow_id"], "my-workflow")
@@ -240,18 +192,11 @@ class TestPublishNextStep(unittest.TestCase):
             {"step-1": "result-1", "step-2": {"nested": "data"}},
         )
 
-    @patch("django_hookflow.workflows.handlers.get_qstash_client")
-    def test_uses_default_webhook_path_when_not_configured(
-        self, mock_get_client
-    ):
+    def test_uses_default_webhook_path_when_not_configured(self):
         """Test that default webhook path is used when not configured."""
-        mock_client = MagicMock()
-        mock_get_client.return_value = mock_client
-
-        with override_settings(
-            DJANGO_HOOKFLOW_DOMAIN="https://example.com",
-        ):
+        with override_settings():
             # Remove DJANGO_HOOKFLOW_WEBHOOK_PATH to use default
+            del settings.DJANGO_HOOKFLOW_WEBHOOK_PATH
             publish_next_step(
                 workflow_id="test-workflow",
                 run_id="test-run",
@@ -259,89 +204,9 @@ class TestPublishNextStep(unittest.TestCase):
                 completed_steps={},
             )
 
-        call_kwargs = mock_client.publish_json.call_args.kwargs
+        call_kwargs = self.mock_client.publish_json.call_args.kwargs
         # Default path should be /hookflow/
-        self.assertIn("/hookflow/workflow/test-workflow/", call_kwargs["url"])
-
-    @patch("django_hookflow.workflows.handlers.get_qstash_client")
-    def test_sleep_delay_overrides_explicit_delay_seconds(
-        self, mock_get_client
-    ):
-        """Test that sleep step delay overrides explicit delay_seconds."""
-        mock_client = MagicMock()
-        mock_get_client.return_value = mock_client
-
-        completed_steps = {
-            "sleep-step": {"slept_for": 120},
-        }
-
-        with override_settings(
-            DJANGO_HOOKFLOW_DOMAIN="https://example.com",
-            DJANGO_HOOKFLOW_WEBHOOK_PATH="/hookflow/",
-        ):
-            publish_next_step(
-                workflow_id="test-workflow",
-                run_id="test-run",
-                data={},
-                completed_steps=completed_steps,
-                delay_seconds=30,  # This should be overridden by slept_for
-            )
-
-        call_kwargs = mock_client.publish_json.call_args.kwargs
-        # Sleep delay (120s) should override explicit delay_seconds (30)
-        self.assertEqual(call_kwargs["delay"], "120s")
-
-    @patch("django_hookflow.workflows.handlers.get_qstash_client")
-    def test_non_dict_last_step_result_uses_explicit_delay(
-        self, mock_get_client
-    ):
-        """Test that non-dict last step uses explicit delay_seconds."""
-        mock_client = MagicMock()
-        mock_get_client.return_value = mock_client
-
-        completed_steps = {
-            "step-1": "string_result",
-        }
-
-        with override_settings(
-            DJANGO_HOOKFLOW_DOMAIN="https://example.com",
-            DJANGO_HOOKFLOW_WEBHOOK_PATH="/hookflow/",
-        ):
-            publish_next_step(
-                workflow_id="test-workflow",
-                run_id="test-run",
-                data={},
-                completed_steps=completed_steps,
-                delay_seconds=15,
-            )
-
-        call_kwargs = mock_client.publish_json.call_args.kwargs
-        self.assertEqual(call_kwargs["delay"], "15s")
-
-    @patch("django_hookflow.workflows.handlers.get_qstash_client")
-    def test_dict_without_slept_for_uses_explicit_delay(self, mock_get_client):
-        """Test that dict without slept_for uses explicit delay."""
-        mock_client = MagicMock()
-        mock_get_client.return_value = mock_client
-
-        completed_steps = {
-            "step-1": {"result": "value", "other_key": 123},
-        }
-
-        with override_settings(
-            DJANGO_HOOKFLOW_DOMAIN="https://example.com",
-            DJANGO_HOOKFLOW_WEBHOOK_PATH="/hookflow/",
-        ):
-            publish_next_step(
-                workflow_id="test-workflow",
-                run_id="test-run",
-                data={},
-                completed_steps=completed_steps,
-                delay_seconds=20,
-            )
-
-        call_kwargs = mock_client.publish_json.call_args.kwargs
-        self.assertEqual(call_kwargs["delay"], "20s")
+        self.assertEqual(call_kwargs["url"], _EXPECTED_WEBHOOK_URL)
 
 
 if __name__ == "__main__":
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 import json
+import random
 import unittest
+from unittest.mock import call
 from unittest.mock import patch
 
-from django.test import RequestFactory
+from django.db import connection
+from django.test import SimpleTestCase
 from django.test import TestCase
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 
 from django_hookflow import workflow
 from django_hookflow.models import WorkflowRun
@@ -15,16 +19,19 @@ from django_hookflow.persistence import WorkflowPersistence
 from django_hookflow.workflows.registry import _workflow_registry
 from django_hookflow.workflows.views import DEFAULT_MAX_PUBLISH_FAILURES
 from django_hookflow.workflows.views import _get_max_publish_failures
+from django_hookflow.workflows.views import _publish_backoff
 from django_hookflow.workflows.views import _publish_with_retry
 from django_hookflow.workflows.views import workflow_webhook_raw
+from tests.utils import copy_request
+from tests.utils import make_json_request
 
 
-class TestWorkflowRunRetryAttempt(TestCase):
+class TestWorkflowRunRetryAttempt(SimpleTestCase):
     """Tests for the retry_attempt field on WorkflowRun model."""
 
     def test_default_retry_attempt_is_zero(self):
         """Test that retry_attempt defaults to 0."""
-        run = WorkflowRun.objects.create(
+        run = WorkflowRun(
             run_id="test-run",
             workflow_id="test-workflow",
             status=WorkflowRunStatus.PENDING,
@@ -33,7 +40,7 @@ class TestWorkflowRunRetryAttempt(TestCase):
 
     def test_retry_attempt_can_be_set(self):
         """Test that retry_attempt can be set and retrieved."""
-        run = WorkflowRun.objects.create(
+        run = WorkflowRun(
             run_id="test-run",
             workflow_id="test-workflow",
             status=WorkflowRunStatus.PENDING,
@@ -42,78 +49,93 @@ class TestWorkflowRunRetryAttempt(TestCase):
         self.assertEqual(run.retry_attempt, 5)
 
 
+def _bulk_create_runs(
+    retry_attempts: dict[str, int],
+    workflow_id: str = "test-workflow",
+) -> None:
+    """Create one running WorkflowRun per run_id/retry_attempt pair."""
+    WorkflowRun.objects.bulk_create(
+        [
+            WorkflowRun(
+                run_id=run_id,
+                workflow_id=workflow_id,
+                status=WorkflowRunStatus.RUNNING,
+                retry_attempt=retry_attempt,
+            )
+            for run_id, retry_attempt in retry_attempts.items()
+        ]
+    )
+
+
+def _retry_attempt(run_id: str) -> int:
+    """
+    Re-fetch a run's retry counter by run_id.
+
+    Looked up by run_id rather than refreshed by pk, since bulk_create
+    only fills in primary keys on SQLite 3.35+.
+    """
+    return (
+        WorkflowRun.objects.only("retry_attempt")
+        .get(run_id=run_id)
+        .retry_attempt
+    )
+
+
 class TestIncrementRetryAttempt(TestCase):
     """Tests for WorkflowPersistence.increment_retry_attempt()."""
 
+    @classmethod
+    def setUpTestData(cls):
+        _bulk_create_runs({"run-at-2": 2, "run-at-0": 0})
+
     def test_increment_retry_attempt(self):
         """Test that increment_retry_attempt increments the counter."""
-        WorkflowRun.objects.create(
-            run_id="test-run",
-            workflow_id="test-workflow",
-            status=WorkflowRunStatus.RUNNING,
-            retry_attempt=2,
-        )
-
-        result = WorkflowPersistence.increment_retry_attempt("test-run")
+        # SAVEPOINT, SELECT ... FOR UPDATE, UPDATE, RELEASE SAVEPOINT
+        with self.assertNumQueries(4):
+            result = WorkflowPersistence.increment_retry_attempt("run-at-2")
 
         self.assertEqual(result, 3)
-        run = WorkflowRun.objects.get(run_id="test-run")
-        self.assertEqual(run.retry_attempt, 3)
+        self.assertEqual(_retry_attempt("run-at-2"), 3)
 
     def test_increment_retry_attempt_from_zero(self):
         """Test incrementing from zero."""
-        WorkflowRun.objects.create(
-            run_id="test-run",
-            workflow_id="test-workflow",
-            status=WorkflowRunStatus.RUNNING,
-        )
-
-        result = WorkflowPersistence.increment_retry_attempt("test-run")
+        result = WorkflowPersistence.increment_retry_attempt("run-at-0")
 
         self.assertEqual(result, 1)
 
     def test_increment_retry_attempt_not_found(self):
         """Test that None is returned for non-existent run."""
-        result = WorkflowPersistence.increment_retry_attempt("nonexistent")
+        with self.assertNumQueries(3):
+            result = WorkflowPersistence.increment_retry_attempt("nonexistent")
         self.assertIsNone(result)
 
 
 class TestResetRetryAttempt(TestCase):
     """Tests for WorkflowPersistence.reset_retry_attempt()."""
 
+    @classmethod
+    def setUpTestData(cls):
+        _bulk_create_runs({"run-at-5": 5, "run-at-0": 0})
+
     def test_reset_retry_attempt(self):
         """Test that reset_retry_attempt resets to zero."""
-        WorkflowRun.objects.create(
-            run_id="test-run",
-            workflow_id="test-workflow",
-            status=WorkflowRunStatus.RUNNING,
-            retry_attempt=5,
-        )
-
-        result = WorkflowPersistence.reset_retry_attempt("test-run")
+        with self.assertNumQueries(1):
+            result = WorkflowPersistence.reset_retry_attempt("run-at-5")
 
         self.assertTrue(result)
-        run = WorkflowRun.objects.get(run_id="test-run")
-        self.assertEqual(run.retry_attempt, 0)
+        self.assertEqual(_retry_attempt("run-at-5"), 0)
 
     def test_reset_retry_attempt_already_zero(self):
         """Test resetting when already zero."""
-        WorkflowRun.objects.create(
-            run_id="test-run",
-            workflow_id="test-workflow",
-            status=WorkflowRunStatus.RUNNING,
-            retry_attempt=0,
-        )
-
-        result = WorkflowPersistence.reset_retry_attempt("test-run")
+        result = WorkflowPersistence.reset_retry_attempt("run-at-0")
 
         self.assertTrue(result)
-        run = WorkflowRun.objects.get(run_id="test-run")
-        self.assertEqual(run.retry_attempt, 0)
+        self.assertEqual(_retry_attempt("run-at-0"), 0)
 
     def test_reset_retry_attempt_not_found(self):
         """Test that False is returned for non-existent run."""
-        result = WorkflowPersistence.reset_retry_attempt("nonexistent")
+        with self.assertNumQueries(1):
+            result = WorkflowPersistence.reset_retry_attempt("nonexistent")
         self.assertFalse(result)
 
 
@@ -131,89 +153,115 @@ class TestGetMaxPublishFailures(unittest.TestCase):
         max_failures = _get_max_publish_failures()
         self.assertEqual(max_failures, 5)
 
+    def test_cached_value_follows_setting_changes(self):
+        """Test that the cached value is dropped when the setting changes."""
+        _get_max_publish_failures()
 
-class TestPublishWithRetry(unittest.TestCase):
-    """Tests for _publish_with_retry function."""
-
-    @patch("django_hookflow.workflows.views.publish_next_step")
-    def test_success_on_first_attempt(self, mock_publish):
-        """Test successful publish on first attempt."""
-        mock_publish.return_value = None
+        with override_settings(DJANGO_HOOKFLOW_MAX_PUBLISH_FAILURES=7):
+            self.assertEqual(_get_max_publish_failures(), 7)
 
-        result = _publish_with_retry(
-            workflow_id="test-wf",
-            run_id="test-run",
-            data={},
-            completed_steps={},
+        self.assertEqual(
+            _get_max_publish_failures(), DEFAULT_MAX_PUBLISH_FAILURES
         )
 
-        self.assertTrue(result)
-        mock_publish.assert_called_once()
+
+class TestPublishWithRetry(unittest.TestCase):
+    """Tests for _publish_with_retry function."""
 
     @override_settings(DJANGO_HOOKFLOW_MAX_PUBLISH_FAILURES=3)
     @patch("django_hookflow.workflows.views.publish_next_step")
     @patch("django_hookflow.workflows.views.time.sleep")
-    def test_retries_on_failure(self, mock_sleep, mock_publish):
-        """Test that publish retries on failure."""
-        mock_publish.side_effect = [
-            Exception("First fail"),
-            Exception("Second fail"),
-            None,  # Third attempt succeeds
+    def test_retry_matrix(self, mock_sleep, mock_publish):
+        """Test publish results, attempts and backoff for each scenario."""
+        cases = [
+            # (name, side_effect, expected_result, calls, sleep_delays)
+            ("success_on_first_attempt", [None], True, 1, []),
+            (
+                "retries_on_failure",
+                [Exception("First fail"), Exception("Second fail"), None],
+                True,
+                3,
+                # Exponential backoff between retries
+                [0.1, 0.2],
+            ),
+            (
+                "returns_false_after_all_retries_fail",
+                Exception("Always fails"),
+                False,
+                3,
+                [0.1, 0.2],
+            ),
         ]
 
-        result = _publish_with_retry(
-            workflow_id="test-wf",
-            run_id="test-run",
-            data={},
-            completed_steps={},
-        )
-
-        self.assertTrue(result)
-        self.assertEqual(mock_publish.call_count, 3)
-        self.assertEqual(mock_sleep.call_count, 2)
+        for name, side_effect, expected, calls, delays in cases:
+            with self.subTest(name):
+                mock_publish.reset_mock(side_effect=True)
+                mock_sleep.reset_mock()
+                mock_publish.side_effect = side_effect
+
+                result = _publish_with_retry(
+                    workflow_id="test-wf",
+                    run_id="test-run",
+                    data={},
+                    completed_steps={},
+                )
+
+                self.assertEqual(result, expected)
+                self.assertEqual(mock_publish.call_count, calls)
+                self.assertEqual(
+                    mock_sleep.call_args_list,
+                    [call(delay) for delay in delays],
+                )
 
     @override_settings(DJANGO_HOOKFLOW_MAX_PUBLISH_FAILURES=3)
     @patch("django_hookflow.workflows.views.publish_next_step")
     @patch("django_hookflow.workflows.views.time.sleep")
-    def test_returns_false_after_all_retries_fail(
-        self, mock_sleep, mock_publish
-    ):
-        """Test that False is returned when all retries fail."""
+    def test_uses_backoff_fn(self, mock_sleep, mock_publish):
+        """Test that backoff_fn decides the delay between attempts."""
         mock_publish.side_effect = Exception("Always fails")
 
-        result = _publish_with_retry(
+        _publish_with_retry(
             workflow_id="test-wf",
             run_id="test-run",
             data={},
             completed_steps={},
+            backoff_fn=lambda publish_attempt: publish_attempt,
         )
 
-        self.assertFalse(result)
-        self.assertEqual(mock_publish.call_count, 3)
-
-    @override_settings(DJANGO_HOOKFLOW_MAX_PUBLISH_FAILURES=3)
-    @patch("django_hookflow.workflows.views.publish_next_step")
-    @patch("django_hookflow.workflows.views.time.sleep")
-    def test_exponential_backoff(self, mock_sleep, mock_publish):
-        """Test that exponential backoff is used between retries."""
-        mock_publish.side_effect = [
-            Exception("First fail"),
-            Exception("Second fail"),
-            None,
+        self.assertEqual(mock_sleep.call_args_list, [call(0), call(1)])
+
+    def test_default_backoff_is_exponential(self):
+        """Test the default backoff doubles from 0.1 seconds."""
+        delays = [_publish_backoff(attempt) for attempt in range(3)]
+        self.assertEqual(delays, [0.1, 0.2, 0.4])
+
+    @override_settings(DJANGO_HOOKFLOW_BACKOFF_JITTER=True)
+    @patch("django_hookflow.workflows.views._rng", random.Random(0))
+    def test_backoff_jitter_stays_within_bounds(self):
+        """Test that jittered delays stay within 25% of the base delay."""
+        for attempt, base in enumerate([0.1, 0.2, 0.4]):
+            with self.subTest(attempt=attempt):
+                delay = _publish_backoff(attempt)
+                self.assertGreaterEqual(delay, base * 0.75)
+                self.assertLessEqual(delay, base * 1.25)
+                self.assertNotEqual(delay, base)
+
+    @patch("django_hookflow.workflows.views._rng")
+    def test_default_backoff_is_capped(self, mock_rng):
+        """Test the backoff never exceeds 60s, with or without jitter."""
+        cases = [
+            # (jitter enabled, jitter draw, expected delay)
+            (False, 0.0, 60.0),
+            (True, 0.25, 60.0),
+            (True, -0.25, 45.0),
         ]
 
-        _publish_with_retry(
-            workflow_id="test-wf",
-            run_id="test-run",
-            data={},
-            completed_steps={},
-        )
-
-        # Check backoff delays: 0.1s, 0.2s
-        self.assertEqual(mock_sleep.call_count, 2)
-        calls = mock_sleep.call_args_list
-        self.assertAlmostEqual(calls[0][0][0], 0.1, places=1)
-        self.assertAlmostEqual(calls[1][0][0], 0.2, places=1)
+        for jitter, draw, expected in cases:
+            mock_rng.uniform.return_value = draw
+            with self.subTest(jitter=jitter, draw=draw):
+                with override_settings(DJANGO_HOOKFLOW_BACKOFF_JITTER=jitter):
+                    self.assertEqual(_publish_backoff(10), expected)
+                    self.assertEqual(_publish_backoff(1000), expected)
 
 
 class TestDefaultMaxPublishFailuresConstant(unittest.TestCase):
@@ -227,9 +275,40 @@ class TestDefaultMaxPublishFailuresConstant(unittest.TestCase):
 class TestWorkflowWebhookRetryPersistence(TestCase):
     """Tests for retry persistence in workflow webhook."""
 
-    def setUp(self):
-        _workflow_registry.clear()
-        self.factory = RequestFactory()
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        _workflow_registry.pop("step-complete-wf", None)
+
+        @workflow(workflow_id="step-complete-wf")
+        def step_complete_workflow(ctx):
+            result = ctx.step.run("step-1", lambda: "done")
+            return result
+
+        cls._base_request = make_json_request(
+            "/hookflow/workflow/step-complete-wf/",
+            json.dumps(
+                {
+                    "workflow_id": "step-complete-wf",
+                    "run_id": "test-run",
+                    "data": {},
+                    "completed_steps": {},
+                }
+            ).encode("utf-8"),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        _workflow_registry.pop("step-complete-wf", None)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        _bulk_create_runs({"test-run": 3}, workflow_id="step-complete-wf")
+
+    def _make_request(self):
+        """Return a fresh copy of the class webhook request."""
+        return copy_request(self._base_request)
 
     @override_settings(
         DJANGO_HOOKFLOW_RATE_LIMIT=None,
@@ -246,40 +325,26 @@ class TestWorkflowWebhookRetryPersistence(TestCase):
         mock_verify.return_value = True
         mock_publish.return_value = True
 
-        # Create a workflow run with retry_attempt > 0
-        WorkflowRun.objects.create(
-            run_id="test-run",
-            workflow_id="step-complete-wf",
-            status=WorkflowRunStatus.RUNNING,
-            retry_attempt=3,
-        )
+        request = self._make_request()
 
-        @workflow(workflow_id="step-complete-wf")
-        def test_workflow(ctx):
-            result = ctx.step.run("step-1", lambda: "done")
-            return result
-
-        payload = {
-            "workflow_id": "step-complete-wf",
-            "run_id": "test-run",
-            "data": {},
-            "completed_steps": {},
-        }
-
-        request = self.factory.post(
-            "/hookflow/workflow/step-complete-wf/",
-            data=json.dumps(payload),
-            content_type="application/json",
-        )
-
-        response = workflow_webhook_raw(
-            request, workflow_id="step-complete-wf"
-        )
+        with CaptureQueriesContext(connection) as ctx:
+            response = workflow_webhook_raw(
+                request, workflow_id="step-complete-wf"
+            )
 
         self.assertEqual(response.status_code, 200)
+        # The reset is a single UPDATE; the rest of the webhook path
+        # is free to change its own queries
+        retry_updates = [
+            query["sql"]
+            for query in ctx.captured_queries
+            if query["sql"].startswith("UPDATE")
+            and "retry_attempt" in query["sql"]
+        ]
+        self.assertEqual(len(retry_updates), 1)
+        self.assertIn("test-run", retry_updates[0])
         # Verify retry was reset
-        run = WorkflowRun.objects.get(run_id="test-run")
-        self.assertEqual(run.retry_attempt, 0)
+        self.assertEqual(_retry_attempt("test-run"), 0)
 
 
 if __name__ == "__main__":
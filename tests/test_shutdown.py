@@ -4,10 +4,9 @@ import json
 import threading
 import time
 import unittest
-from unittest.mock import MagicMock
 from unittest.mock import patch
 
-from django.test import RequestFactory
+from django.test import SimpleTestCase
 from django.test import override_settings
 
 from django_hookflow import workflow
@@ -15,160 +14,188 @@ from django_hookflow.shutdown import ShutdownManager
 from django_hookflow.shutdown import get_shutdown_manager
 from django_hookflow.workflows.registry import _workflow_registry
 from django_hookflow.workflows.views import workflow_webhook_raw
+from tests.utils import copy_request
+from tests.utils import make_json_request
 
 
-class TestShutdownManager(unittest.TestCase):
+@override_settings(DJANGO_HOOKFLOW_GRACEFUL_SHUTDOWN_ENABLED=True)
+class TestShutdownManager(SimpleTestCase):
     """Tests for the ShutdownManager class."""
 
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._shared = ShutdownManager()
+
     def setUp(self):
-        self.manager = ShutdownManager()
+        self.manager = self._shared
+
+    def tearDown(self):
+        self.manager.reset()
 
-    @override_settings(DJANGO_HOOKFLOW_GRACEFUL_SHUTDOWN_ENABLED=True)
     def test_initial_state(self):
         """Test initial state of shutdown manager."""
-        manager = ShutdownManager()
-        self.assertFalse(manager.is_shutting_down)
-        self.assertEqual(manager.in_flight_count, 0)
+        self.assertFalse(self.manager.is_shutting_down)
+        self.assertEqual(self.manager.in_flight_count, 0)
 
-    @override_settings(DJANGO_HOOKFLOW_GRACEFUL_SHUTDOWN_ENABLED=True)
     def test_track_request_start(self):
         """Test tracking request start."""
-        manager = ShutdownManager()
-
-        result = manager.track_request_start("run-1")
+        result = self.manager.track_request_start("run-1")
 
         self.assertTrue(result)
-        self.assertEqual(manager.in_flight_count, 1)
-        self.assertIn("run-1", manager.get_in_flight_requests())
+        self.assertEqual(self.manager.in_flight_count, 1)
+        self.assertIn("run-1", self.manager.get_in_flight_requests())
 
-    @override_settings(DJANGO_HOOKFLOW_GRACEFUL_SHUTDOWN_ENABLED=True)
     def test_track_request_end(self):
         """Test tracking request end."""
-        manager = ShutdownManager()
-        manager.track_request_start("run-1")
+        self.manager.track_request_start("run-1")
 
-        manager.track_request_end("run-1")
+        self.manager.track_request_end("run-1")
 
-        self.assertEqual(manager.in_flight_count, 0)
-        self.assertNotIn("run-1", manager.get_in_flight_requests())
+        self.assertEqual(self.manager.in_flight_count, 0)
+        self.assertNotIn("run-1", self.manager.get_in_flight_requests())
+
+    def test_track_request_batch(self):
+        """Test tracking a batch of requests start and end."""
+        result = self.manager.track_request_start_many(["run-1", "run-2"])
+
+        self.assertTrue(result)
+        self.assertEqual(self.manager.in_flight_count, 2)
+
+        self.manager.track_request_end_many(["run-1", "run-2"])
+
+        self.assertEqual(self.manager.in_flight_count, 0)
+
+    def test_reject_request_batch_during_shutdown(self):
+        """Test that a batch is rejected as a whole during shutdown."""
+        self.manager.initiate_shutdown()
+
+        result = self.manager.track_request_start_many(["run-1", "run-2"])
+
+        self.assertFalse(result)
+        self.assertEqual(self.manager.in_flight_count, 0)
 
-    @override_settings(DJANGO_HOOKFLOW_GRACEFUL_SHUTDOWN_ENABLED=True)
     def test_track_request_context_manager(self):
         """Test the track_request context manager."""
-        manager = ShutdownManager()
-
-        with manager.track_request("run-1") as allowed:
+        with self.manager.track_request("run-1") as allowed:
             self.assertTrue(allowed)
-            self.assertEqual(manager.in_flight_count, 1)
+            self.assertEqual(self.manager.in_flight_count, 1)
 
-        self.assertEqual(manager.in_flight_count, 0)
+        self.assertEqual(self.manager.in_flight_count, 0)
 
-    @override_settings(DJANGO_HOOKFLOW_GRACEFUL_SHUTDOWN_ENABLED=True)
     def test_reject_new_requests_during_shutdown(self):
         """Test that new requests are rejected during shutdown."""
-        manager = ShutdownManager()
-
         # Simulate an in-flight request
-        manager.track_request_start("run-1")
+        self.manager.track_request_start("run-1")
 
         # Start shutdown in a separate thread (non-blocking)
         def do_shutdown():
-            manager.initiate_shutdown()
+            self.manager.initiate_shutdown()
 
         shutdown_thread = threading.Thread(target=do_shutdown)
         shutdown_thread.start()
 
-        # Give it a moment to set the shutdown flag
-        time.sleep(0.1)
+        # Wait until the shutdown flag is set
+        self.assertTrue(self.manager._shutdown_started.wait(timeout=1.0))
 
         # New request should be rejected
-        result = manager.track_request_start("run-2")
+        result = self.manager.track_request_start("run-2")
         self.assertFalse(result)
 
         # Clean up
-        manager.track_request_end("run-1")
+        self.manager.track_request_end("run-1")
         shutdown_thread.join(timeout=2)
 
-    @override_settings(
-        DJANGO_HOOKFLOW_GRACEFUL_SHUTDOWN_ENABLED=True,
-        DJANGO_HOOKFLOW_SHUTDOWN_TIMEOUT=1,
-    )
+    @override_settings(DJANGO_HOOKFLOW_SHUTDOWN_TIMEOUT=1)
     def test_shutdown_waits_for_in_flight(self):
         """Test that shutdown waits for in-flight requests."""
-        manager = ShutdownManager()
-        manager.track_request_start("run-1")
+        self.manager.track_request_start("run-1")
 
         # Start shutdown in a separate thread
         completed = []
 
         def do_shutdown():
-            manager.initiate_shutdown()
+            self.manager.initiate_shutdown()
             completed.append(True)
 
         shutdown_thread = threading.Thread(target=do_shutdown)
         shutdown_thread.start()
 
-        # Give shutdown a moment to start waiting
-        time.sleep(0.2)
+        # Wait until shutdown has started; the completion event is sticky,
+        # so ending the request before the wait begins is also fine
+        self.assertTrue(self.manager._shutdown_started.wait(timeout=1.0))
 
         # Complete the in-flight request
-        manager.track_request_end("run-1")
+        self.manager.track_request_end("run-1")
 
         # Shutdown should complete
         shutdown_thread.join(timeout=2)
         self.assertTrue(len(completed) > 0)
 
-    @override_settings(
-        DJANGO_HOOKFLOW_GRACEFUL_SHUTDOWN_ENABLED=True,
-        DJANGO_HOOKFLOW_SHUTDOWN_TIMEOUT=1,
-    )
+    @override_settings(DJANGO_HOOKFLOW_SHUTDOWN_TIMEOUT=5)
+    def test_shutdown_waits_for_in_flight_batch(self):
+        """Test that ending a batch lets a waiting shutdown complete."""
+        self.manager.track_request_start_many(["run-1", "run-2"])
+
+        completed = []
+
+        def do_shutdown():
+            self.manager.initiate_shutdown()
+            completed.append(True)
+
+        shutdown_thread = threading.Thread(target=do_shutdown)
+        shutdown_thread.start()
+
+        self.assertTrue(self.manager._shutdown_started.wait(timeout=1.0))
+
+        self.manager.track_request_end_many(["run-1", "run-2"])
+
+        # Well under the 5s timeout, so completion came from the batch end
+        shutdown_thread.join(timeout=2)
+        self.assertFalse(shutdown_thread.is_alive())
+        self.assertTrue(len(completed) > 0)
+        self.assertTrue(self.manager._shutdown_complete.is_set())
+
+    @override_settings(DJANGO_HOOKFLOW_SHUTDOWN_TIMEOUT=0.1)
     def test_shutdown_timeout(self):
         """Test that shutdown times out if requests don't complete."""
-        manager = ShutdownManager()
-        manager.track_request_start("run-1")
+        self.manager.track_request_start("run-1")
 
         # Start shutdown
         start_time = time.time()
-        manager.initiate_shutdown()
+        self.manager.initiate_shutdown()
         elapsed = time.time() - start_time
 
         # Should have waited approximately the timeout duration
-        self.assertGreaterEqual(elapsed, 0.9)
-        self.assertLess(elapsed, 2)
+        self.assertGreaterEqual(elapsed, 0.09)
+        self.assertLess(elapsed, 1)
 
         # Request is still tracked
-        self.assertEqual(manager.in_flight_count, 1)
+        self.assertEqual(self.manager.in_flight_count, 1)
 
-    @override_settings(DJANGO_HOOKFLOW_GRACEFUL_SHUTDOWN_ENABLED=True)
     def test_shutdown_completes_immediately_if_no_requests(self):
         """Test that shutdown completes immediately with no in-flight."""
-        manager = ShutdownManager()
-
         start_time = time.time()
-        manager.initiate_shutdown()
+        self.manager.initiate_shutdown()
         elapsed = time.time() - start_time
 
         # Should complete very quickly
         self.assertLess(elapsed, 0.5)
 
-    @override_settings(DJANGO_HOOKFLOW_GRACEFUL_SHUTDOWN_ENABLED=True)
     def test_reset(self):
         """Test the reset method."""
-        manager = ShutdownManager()
-        manager.track_request_start("run-1")
+        self.manager.track_request_start("run-1")
 
-        manager.reset()
+        self.manager.reset()
 
-        self.assertFalse(manager.is_shutting_down)
-        self.assertEqual(manager.in_flight_count, 0)
+        self.assertFalse(self.manager.is_shutting_down)
+        self.assertEqual(self.manager.in_flight_count, 0)
 
-    @override_settings(DJANGO_HOOKFLOW_GRACEFUL_SHUTDOWN_ENABLED=True)
     def test_get_status(self):
         """Test the get_status method."""
-        manager = ShutdownManager()
-        manager.track_request_start("run-1")
+        self.manager.track_request_start("run-1")
 
-        status = manager.get_status()
+        status = self.manager.get_status()
 
         self.assertTrue(status["enabled"])
         self.assertFalse(status["shutting_down"])
@@ -178,26 +205,41 @@ class TestShutdownManager(unittest.TestCase):
     @override_settings(DJANGO_HOOKFLOW_GRACEFUL_SHUTDOWN_ENABLED=False)
     def test_disabled_always_allows_requests(self):
         """Test that requests are always allowed when disabled."""
-        manager = ShutdownManager()
-
         # Even during "shutdown", should allow
-        manager._shutting_down = True
+        self.manager._shutting_down = True
 
-        result = manager.track_request_start("run-1")
+        result = self.manager.track_request_start("run-1")
         self.assertTrue(result)
 
+    @override_settings(DJANGO_HOOKFLOW_GRACEFUL_SHUTDOWN_ENABLED=False)
+    def test_disabled_batch_always_allows_requests(self):
+        """Test that batch tracking is a no-op when disabled."""
+        self.manager._shutting_down = True
 
-class TestShutdownManagerThreadSafety(unittest.TestCase):
+        result = self.manager.track_request_start_many(["run-1", "run-2"])
+        self.assertTrue(result)
+        self.assertEqual(self.manager.in_flight_count, 0)
+
+        # Ending a batch leaves existing entries alone when disabled
+        self.manager._in_flight["run-3"] = time.time()
+        self.manager.track_request_end_many(["run-3"])
+        self.assertEqual(self.manager.in_flight_count, 1)
+
+
+@override_settings(DJANGO_HOOKFLOW_GRACEFUL_SHUTDOWN_ENABLED=True)
+class TestShutdownManagerThreadSafety(SimpleTestCase):
     """Tests for thread safety of ShutdownManager."""
 
-    @override_settings(DJANGO_HOOKFLOW_GRACEFUL_SHUTDOWN_ENABLED=True)
     def test_concurrent_request_tracking(self):
         """Test concurrent request tracking is thread-safe."""
         manager = ShutdownManager()
+        barrier = threading.Barrier(4)
 
         def track_requests(start_id):
-            for i in range(100):
-                run_id = f"run-{start_id}-{i}"
+            run_ids = [f"run-{start_id}-{i}" for i in range(100)]
+            # Release all threads into the critical section together
+            barrier.wait()
+            for run_id in run_ids:
                 manager.track_request_start(run_id)
                 manager.track_request_end(run_id)
 
@@ -214,6 +256,29 @@ class TestShutdownManagerThreadSafety(unittest.TestCase):
         # All requests should have been cleaned up
         self.assertEqual(manager.in_flight_count, 0)
 
+    def test_concurrent_batch_request_tracking(self):
+        """Test concurrent batch tracking is thread-safe."""
+        manager = ShutdownManager()
+        barrier = threading.Barrier(4)
+
+        def track_requests(start_id):
+            run_ids = [f"run-{start_id}-{i}" for i in range(100)]
+            barrier.wait()
+            manager.track_request_start_many(run_ids)
+            manager.track_request_end_many(run_ids)
+
+        threads = [
+            threading.Thread(target=track_requests, args=(i,))
+            for i in range(4)
+        ]
+
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(manager.in_flight_count, 0)
+
 
 class TestGetShutdownManager(unittest.TestCase):
     """Tests for the singleton getter."""
@@ -225,12 +290,60 @@ class TestGetShutdownManager(unittest.TestCase):
         self.assertIs(manager1, manager2)
 
 
+class _StubShutdownManager:
+    """Minimal stand-in for the ShutdownManager used by the webhook."""
+
+    def __init__(self, is_shutting_down: bool) -> None:
+        self.is_shutting_down = is_shutting_down
+        self.started: list[str] = []
+        self.ended: list[str] = []
+
+    def track_request_start(self, run_id: str) -> bool:
+        self.started.append(run_id)
+        return not self.is_shutting_down
+
+    def track_request_end(self, run_id: str) -> None:
+        self.ended.append(run_id)
+
+
 class TestWorkflowWebhookShutdown(unittest.TestCase):
     """Tests for shutdown handling in workflow webhook."""
 
-    def setUp(self):
-        _workflow_registry.clear()
-        self.factory = RequestFactory()
+    _workflow_ids = ("test-shutdown-wf", "test-track-wf")
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for workflow_id in cls._workflow_ids:
+            _workflow_registry.pop(workflow_id, None)
+
+            @workflow(workflow_id=workflow_id)
+            def test_workflow(ctx):
+                return "result"
+
+        cls._base_requests = {}
+        for workflow_id in cls._workflow_ids:
+            cls._base_requests[workflow_id] = make_json_request(
+                f"/hookflow/workflow/{workflow_id}/",
+                json.dumps(
+                    {
+                        "workflow_id": workflow_id,
+                        "run_id": "test-run",
+                        "data": {},
+                        "completed_steps": {},
+                    }
+                ).encode("utf-8"),
+            )
+
+    @classmethod
+    def tearDownClass(cls):
+        for workflow_id in cls._workflow_ids:
+            _workflow_registry.pop(workflow_id, None)
+        super().tearDownClass()
+
+    def _make_request(self, workflow_id: str):
+        """Return a fresh copy of the webhook request for a workflow."""
+        return copy_request(self._base_requests[workflow_id])
 
     @override_settings(
         DJANGO_HOOKFLOW_RATE_LIMIT=None,
@@ -246,27 +359,10 @@ class TestWorkflowWebhookShutdown(unittest.TestCase):
         """Test that webhook rejects requests during shutdown."""
         mock_verify.return_value = True
 
-        # Mock a shutting down manager
-        mock_manager = MagicMock()
-        mock_manager.is_shutting_down = True
-        mock_get_manager.return_value = mock_manager
-
-        @workflow(workflow_id="test-shutdown-wf")
-        def test_workflow(ctx):
-            return "result"
-
-        payload = {
-            "workflow_id": "test-shutdown-wf",
-            "run_id": "test-run",
-            "data": {},
-            "completed_steps": {},
-        }
-
-        request = self.factory.post(
-            "/hookflow/workflow/test-shutdown-wf/",
-            data=json.dumps(payload),
-            content_type="application/json",
-        )
+        # Stub a shutting down manager
+        mock_get_manager.return_value = _StubShutdownManager(True)
+
+        request = self._make_request("test-shutdown-wf")
 
         response = workflow_webhook_raw(
             request, workflow_id="test-shutdown-wf"
@@ -290,33 +386,17 @@ class TestWorkflowWebhookShutdown(unittest.TestCase):
         """Test that webhook tracks request start and end."""
         mock_verify.return_value = True
 
-        mock_manager = MagicMock()
-        mock_manager.is_shutting_down = False
-        mock_get_manager.return_value = mock_manager
-
-        @workflow(workflow_id="test-track-wf")
-        def test_workflow(ctx):
-            return "result"
-
-        payload = {
-            "workflow_id": "test-track-wf",
-            "run_id": "test-run",
-            "data": {},
-            "completed_steps": {},
-        }
-
-        request = self.factory.post(
-            "/hookflow/workflow/test-track-wf/",
-            data=json.dumps(payload),
-            content_type="application/json",
-        )
+        manager = _StubShutdownManager(False)
+        mock_get_manager.return_value = manager
+
+        request = self._make_request("test-track-wf")
 
         response = workflow_webhook_raw(request, workflow_id="test-track-wf")
 
         self.assertEqual(response.status_code, 200)
         # Verify tracking methods were called
-        mock_manager.track_request_start.assert_called_once_with("test-run")
-        mock_manager.track_request_end.assert_called_once_with("test-run")
+        self.assertEqual(manager.started, ["test-run"])
+        self.assertEqual(manager.ended, ["test-run"])
 
 
 if __name__ == "__main__":
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import json
-import time
 import unittest
+from unittest.mock import MagicMock
 from unittest.mock import patch
 
-from django.test import RequestFactory
+from django.http import HttpRequest
+from django.test import SimpleTestCase
 from django.test import override_settings
 
 from django_hookflow import workflow
@@ -17,6 +18,12 @@ from django_hookflow.workflows.views import _get_execution_timeout
 from django_hookflow.workflows.views import _TimeoutFlag
 from django_hookflow.workflows.views import workflow_webhook_raw
 
+# Pre-encoded webhook payload; fill in workflow_id (bytes) and attempt
+_PAYLOAD_TEMPLATE = (
+    b'{"workflow_id":"%s","run_id":"test-run","data":{},'
+    b'"completed_steps":{},"attempt":%d}'
+)
+
 
 class TestTimeoutFlag(unittest.TestCase):
     """Tests for the _TimeoutFlag helper class."""
@@ -26,16 +33,35 @@ class TestTimeoutFlag(unittest.TestCase):
         flag = _TimeoutFlag()
         self.assertFalse(flag.is_timed_out())
 
-    def test_set_timed_out_changes_state(self):
-        """Test that set_timed_out() changes the flag state."""
-        flag = _TimeoutFlag()
-        flag.set_timed_out()
+    def test_past_deadline_is_timed_out(self):
+        """Test that a flag whose deadline has passed reports a timeout."""
+        flag = _TimeoutFlag(deadline=0.0)
         self.assertTrue(flag.is_timed_out())
 
 
+class _FakeClock:
+    """Manually advanced stand-in for the views module clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        """Move time forward."""
+        self.now += seconds
+
+
 class TestExecutionTimeoutContextManager(unittest.TestCase):
     """Tests for the _execution_timeout context manager."""
 
+    def setUp(self):
+        self.clock = _FakeClock()
+        patcher = patch("django_hookflow.workflows.views._clock", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def test_normal_execution_completes(self):
         """Test that normal execution completes without error."""
         with _execution_timeout(10, "test-workflow", "test-run") as flag:
@@ -52,7 +78,7 @@ class TestExecutionTimeoutContextManager(unittest.TestCase):
             with _execution_timeout(1, "test-workflow", "test-run") as flag:
                 flag_captured = flag
                 # Wait for timeout
-                time.sleep(1.5)
+                self.clock.advance(1.5)
                 self.assertTrue(flag.is_timed_out())
         except ExecutionTimeoutError:
             # Expected - verify flag was set
@@ -62,7 +88,7 @@ class TestExecutionTimeoutContextManager(unittest.TestCase):
         """Test that ExecutionTimeoutError is raised on context exit."""
         with self.assertRaises(ExecutionTimeoutError) as ctx:
             with _execution_timeout(1, "test-workflow", "test-run"):
-                time.sleep(1.5)
+                self.clock.advance(1.5)
 
         self.assertEqual(ctx.exception.timeout_seconds, 1)
         self.assertEqual(ctx.exception.workflow_id, "test-workflow")
@@ -71,11 +97,11 @@ class TestExecutionTimeoutContextManager(unittest.TestCase):
     def test_zero_timeout_disables_timer(self):
         """Test that timeout of 0 disables the timer."""
         with _execution_timeout(0, "test-workflow", "test-run") as flag:
-            time.sleep(0.1)
+            self.clock.advance(0.1)
             self.assertFalse(flag.is_timed_out())
 
 
-class TestGetExecutionTimeout(unittest.TestCase):
+class TestGetExecutionTimeout(SimpleTestCase):
     """Tests for the _get_execution_timeout function."""
 
     def test_returns_default_when_not_configured(self):
@@ -111,161 +137,163 @@ class TestExecutionTimeoutError(unittest.TestCase):
 class TestWorkflowDecoratorTimeout(unittest.TestCase):
     """Tests for per-workflow timeout configuration."""
 
-    def setUp(self):
-        _workflow_registry.clear()
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._registry_snapshot = dict(_workflow_registry)
+
+    def tearDown(self):
+        self._drop_added_workflows()
+
+    def _drop_added_workflows(self):
+        """Remove only the workflows registered since setUpClass."""
+        for workflow_id in list(_workflow_registry):
+            if workflow_id not in self._registry_snapshot:
+                del _workflow_registry[workflow_id]
+
+    def test_timeout_attribute(self):
+        """Test that the timeout parameter is stored on the workflow."""
+        cases = [
+            # (decorator kwargs, expected timeout)
+            ({}, None),
+            ({"timeout": 60}, 60),
+            # timeout=0 is kept so it can disable the global timeout
+            ({"timeout": 0}, 0),
+        ]
+
+        for kwargs, expected in cases:
+            with self.subTest(kwargs=kwargs):
+                self._drop_added_workflows()
+                decorator = workflow(**kwargs) if kwargs else workflow
+
+                @decorator
+                def test_workflow(ctx):
+                    return "result"
+
+                self.assertEqual(test_workflow.timeout, expected)
+
+
+def _raise_execution_timeout(ctx):
+    """Workflow body that fails the way an expired timeout does."""
+    raise ExecutionTimeoutError(
+        "Workflow execution exceeded timeout of 1s",
+        timeout_seconds=1,
+        workflow_id=ctx.workflow_id,
+        run_id=ctx.run_id,
+    )
 
-    def test_workflow_without_timeout_has_none(self):
-        """Test that workflow without timeout parameter has None."""
 
-        @workflow
-        def test_workflow(ctx):
-            return "result"
+def _raw_request(workflow_id: str, body: bytes) -> HttpRequest:
+    """
+    Build a bare JSON POST without RequestFactory's WSGI emulation.
 
-        self.assertIsNone(test_workflow.timeout)
+    workflow_webhook_raw only reads the method, body and headers, so a
+    plain HttpRequest with a preset body is enough.
+    """
+    request = HttpRequest()
+    request.method = "POST"
+    request.path = f"/hookflow/workflow/{workflow_id}/"
+    request._body = body
+    request.META["CONTENT_TYPE"] = "application/json"
+    request.META["HTTP_HOST"] = "testserver"
+    return request
 
-    def test_workflow_with_timeout_parameter(self):
-        """Test that workflow timeout parameter is stored."""
 
-        @workflow(timeout=60)
-        def test_workflow(ctx):
-            return "result"
+class TestWorkflowWebhookTimeout(unittest.TestCase):
+    """Tests for timeout handling in workflow webhook."""
 
-        self.assertEqual(test_workflow.timeout, 60)
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._registry_snapshot = dict(_workflow_registry)
+        for workflow_id in ("slow-workflow", "custom-timeout-wf"):
+            _workflow_registry.pop(workflow_id, None)
 
-    def test_workflow_timeout_zero_disables_timeout(self):
-        """Test that timeout=0 can be used to disable timeout."""
+        cls.slow_workflow = workflow(workflow_id="slow-workflow", timeout=1)(
+            _raise_execution_timeout
+        )
 
-        @workflow(timeout=0)
-        def test_workflow(ctx):
+        @workflow(workflow_id="custom-timeout-wf", timeout=0)
+        def fast_workflow(ctx):
             return "result"
 
-        self.assertEqual(test_workflow.timeout, 0)
+        cls.fast_workflow = fast_workflow
 
+        cls.mock_verify = MagicMock(return_value=True)
+        cls.mock_publish = MagicMock(return_value=True)
+        view_patcher = patch.multiple(
+            "django_hookflow.workflows.views",
+            verify_qstash_signature=cls.mock_verify,
+            _publish_with_retry=cls.mock_publish,
+        )
+        view_patcher.start()
+        cls.addClassCleanup(view_patcher.stop)
 
-class TestWorkflowWebhookTimeout(unittest.TestCase):
-    """Tests for timeout handling in workflow webhook."""
+        # Keep DLQ writes off the database for every test in the class
+        dlq_patcher = patch("django_hookflow.dlq.DeadLetterEntry.add_entry")
+        cls.mock_dlq = dlq_patcher.start()
+        cls.addClassCleanup(dlq_patcher.stop)
 
     def setUp(self):
-        _workflow_registry.clear()
-        self.factory = RequestFactory()
-
-    @override_settings(
-        DJANGO_HOOKFLOW_RATE_LIMIT=None,
-        DJANGO_HOOKFLOW_EXECUTION_TIMEOUT=1,
-    )
-    @patch("django_hookflow.workflows.views.verify_qstash_signature")
-    @patch("django_hookflow.workflows.views._publish_with_retry")
-    @patch("django_hookflow.dlq.DeadLetterEntry.add_entry")
-    def test_timeout_triggers_retry(
-        self,
-        mock_dlq,
-        mock_publish,
-        mock_verify,
-    ):
-        """Test that timeout triggers retry scheduling."""
-        mock_verify.return_value = True
-        mock_publish.return_value = True
-
-        @workflow(workflow_id="slow-workflow", timeout=1)
-        def slow_workflow(ctx):
-            time.sleep(2)  # Exceed timeout
-            return "result"
+        self.mock_publish.reset_mock()
+        self.mock_dlq.reset_mock()
 
-        payload = {
-            "workflow_id": "slow-workflow",
-            "run_id": "test-run",
-            "data": {},
-            "completed_steps": {},
-            "attempt": 0,
-        }
-
-        request = self.factory.post(
-            "/hookflow/workflow/slow-workflow/",
-            data=json.dumps(payload),
-            content_type="application/json",
+    @classmethod
+    def tearDownClass(cls):
+        _workflow_registry.clear()
+        _workflow_registry.update(cls._registry_snapshot)
+        super().tearDownClass()
+
+    def _make_request(self, workflow_id: str, attempt: int = 0):
+        """Build a webhook POST for a workflow at the given attempt."""
+        return _raw_request(
+            workflow_id,
+            _PAYLOAD_TEMPLATE % (workflow_id.encode("ascii"), attempt),
         )
 
-        response = workflow_webhook_raw(request, workflow_id="slow-workflow")
-
-        self.assertEqual(response.status_code, 200)
-        response_data = json.loads(response.content)
-        self.assertEqual(response_data["status"], "retrying")
-        self.assertEqual(response_data["reason"], "execution_timeout")
-        mock_publish.assert_called_once()
-
     @override_settings(
         DJANGO_HOOKFLOW_RATE_LIMIT=None,
         DJANGO_HOOKFLOW_EXECUTION_TIMEOUT=1,
     )
-    @patch("django_hookflow.workflows.views.verify_qstash_signature")
-    @patch("django_hookflow.workflows.views._publish_with_retry")
-    @patch("django_hookflow.dlq.DeadLetterEntry.add_entry")
-    @patch("django_hookflow.retry.should_retry")
-    def test_timeout_adds_to_dlq_when_no_retries(
-        self,
-        mock_should_retry,
-        mock_dlq,
-        mock_publish,
-        mock_verify,
-    ):
-        """Test that timeout adds to DLQ when retries exhausted."""
-        mock_verify.return_value = True
-        mock_publish.return_value = True
-        mock_should_retry.return_value = False
-
-        @workflow(workflow_id="slow-workflow-dlq", timeout=1)
-        def slow_workflow(ctx):
-            time.sleep(2)
-            return "result"
-
-        payload = {
-            "workflow_id": "slow-workflow-dlq",
-            "run_id": "test-run",
-            "data": {},
-            "completed_steps": {},
-            "attempt": 3,
-        }
-
-        request = self.factory.post(
-            "/hookflow/workflow/slow-workflow-dlq/",
-            data=json.dumps(payload),
-            content_type="application/json",
-        )
-
-        response = workflow_webhook_raw(
-            request, workflow_id="slow-workflow-dlq"
-        )
-
-        self.assertEqual(response.status_code, 504)
-        response_data = json.loads(response.content)
-        self.assertTrue(response_data["added_to_dlq"])
-        mock_dlq.assert_called_once()
+    @patch("django_hookflow.workflows.views.should_retry")
+    def test_timeout_dispatches_to_retry_then_dlq(self, mock_should_retry):
+        """Test that timeout retries, then adds to DLQ when exhausted."""
+        for attempt, should_retry, expected_status in [
+            (0, True, 200),
+            (3, False, 504),
+        ]:
+            with self.subTest(attempt=attempt, should_retry=should_retry):
+                mock_should_retry.return_value = should_retry
+                self.mock_publish.reset_mock()
+                self.mock_dlq.reset_mock()
+
+                request = self._make_request("slow-workflow", attempt=attempt)
+
+                response = workflow_webhook_raw(
+                    request, workflow_id="slow-workflow"
+                )
+
+                self.assertEqual(response.status_code, expected_status)
+                response_data = json.loads(response.content)
+                if should_retry:
+                    self.assertEqual(response_data["status"], "retrying")
+                    self.assertEqual(
+                        response_data["reason"], "execution_timeout"
+                    )
+                    self.mock_publish.assert_called_once()
+                    self.mock_dlq.assert_not_called()
+                else:
+                    self.assertTrue(response_data["added_to_dlq"])
+                    self.mock_publish.assert_not_called()
+                    self.mock_dlq.assert_called_once()
 
     @override_settings(
         DJANGO_HOOKFLOW_RATE_LIMIT=None,
         DJANGO_HOOKFLOW_EXECUTION_TIMEOUT=60,
     )
-    @patch("django_hookflow.workflows.views.verify_qstash_signature")
-    def test_per_workflow_timeout_overrides_global(self, mock_verify):
+    def test_per_workflow_timeout_overrides_global(self):
         """Test that per-workflow timeout takes precedence."""
-        mock_verify.return_value = True
-
-        @workflow(workflow_id="custom-timeout-wf", timeout=0)
-        def fast_workflow(ctx):
-            return "result"
-
-        payload = {
-            "workflow_id": "custom-timeout-wf",
-            "run_id": "test-run",
-            "data": {},
-            "completed_steps": {},
-        }
-
-        request = self.factory.post(
-            "/hookflow/workflow/custom-timeout-wf/",
-            data=json.dumps(payload),
-            content_type="application/json",
-        )
+        request = self._make_request("custom-timeout-wf")
 
         response = workflow_webhook_raw(
             request, workflow_id="custom-timeout-wf"
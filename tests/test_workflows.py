@@ -131,8 +131,9 @@ class TestStepManager(unittest.TestCase):
         with self.assertRaises(WorkflowError) as context:
             manager.run("step-1", failing_function)
 
-        self.assertIn("step-1", str(context.exception))
-        self.assertIn("Something went wrong", str(context.exception))
+        msg = str(context.exception)
+        self.assertIn("step-1", msg)
+        self.assertIn("Something went wrong", msg)
 
     def test_sleep_returns_if_already_completed(self):
         completed_steps = {"sleep-1": {"slept_for": 60}}
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import copy
+
+from django.http import HttpRequest
+from django.test import RequestFactory
+
+
+def make_json_request(path: str, body: bytes) -> HttpRequest:
+    """
+    Build a JSON POST request to share as a class-level template.
+
+    Args:
+        path: The request path
+        body: The raw JSON request body
+
+    Returns:
+        A RequestFactory request whose body has already been read
+    """
+    request = RequestFactory().post(
+        path,
+        data=body,
+        content_type="application/json",
+    )
+    # Read the stream once so that copies share the cached body instead
+    # of each reading an already consumed stream
+    _ = request.body
+    return request
+
+
+def copy_request(request: HttpRequest, **meta: str) -> HttpRequest:
+    """
+    Return a shallow copy of a request with its own META dict.
+
+    Args:
+        request: The template request to copy
+        **meta: Extra META entries to set on the copy
+
+    Returns:
+        The copied request
+    """
+    request = copy.copy(request)
+    request.META = {**request.META, **meta}
+    return request